@@ -2,23 +2,46 @@
 
 import datetime
 from dateutil import relativedelta
-import requests
+import httpx
+import atexit
 import os
-from xml.dom import minidom
+from lxml import etree
+import numpy as np
+import orjson
 import time
 import hashlib
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Personal access token with permissions: read:enterprise, read:org, read:repo_hook, read:user, repo
 HEADERS = {"authorization": "token " + os.environ["ACCESS_TOKEN"]}
 USER_NAME = os.environ["USER_NAME"]  # 'AyushSehrawat'
+# One HTTP/2 connection to api.github.com, shared (and multiplexed) by every GraphQL call
+SESSION = httpx.Client(http2=True, headers=HEADERS, timeout=30.0)
+atexit.register(SESSION.close)
+CACHE_FILENAME = (
+    "cache/" + hashlib.sha256(USER_NAME.encode("utf-8")).hexdigest() + ".txt"
+)  # Create a unique filename for each user
+CACHE_COMMENT_END = "###END_COMMENT###\n"  # ends the comment block at the top of the cache file
+CACHE_COMMENT_LINES = 7  # size of new comment blocks, and of every comment block written before CACHE_COMMENT_END
 QUERY_COUNT = {
-    "user_getter": 0,
-    "follower_getter": 0,
-    "graph_repos_stars": 0,
     "recursive_loc": 0,
     "graph_commits": 0,
     "loc_query": 0,
+    "batched_bootstrap": 0,
 }
+QUERY_COUNT_LOCK = threading.Lock()
+# recursive_loc runs in a thread pool of this size, which keeps concurrent GraphQL calls low enough
+# to stay clear of the anti-abuse limit
+LOC_WORKERS = 8
+RETRY_STATUS = {429, 502, 503, 504}  # also retried: 403 secondary rate limits
+RETRY_DELAY_BASE = 2  # seconds, doubled on every retry
+RETRY_DELAY_CAP = 30
+MAX_RETRIES = 5
+TSPAN_XPATH = etree.XPath(
+    "//svg:tspan", namespaces={"svg": "http://www.w3.org/2000/svg"}
+)  # every tspan in the SVG, in document order
 
 
 def daily_readme(birthday):
@@ -50,17 +73,58 @@ def format_plural(unit):
     return "s" if unit != 1 else ""
 
 
+def response_json(request):
+    """
+    Returns the decoded JSON body of a response, parsed straight from the raw bytes with orjson
+    """
+    return orjson.loads(request.content)
+
+
+def retry_delay(request, retry_count):
+    """
+    Returns how many seconds to wait before retrying a failed request, or None if it shouldn't be retried
+    Honors GitHub's Retry-After and X-RateLimit-Reset headers, otherwise backs off exponentially with jitter
+    so that the threads in loc_pool don't all retry at the same moment
+    """
+    if retry_count >= MAX_RETRIES:
+        return None
+    if not (
+        request.status_code in RETRY_STATUS
+        or (request.status_code == 403 and "rate limit" in request.text.lower())
+    ):
+        return None
+    if "Retry-After" in request.headers:
+        return int(request.headers["Retry-After"])
+    if request.headers.get("X-RateLimit-Remaining") == "0":
+        return max(int(request.headers["X-RateLimit-Reset"]) - time.time(), 0)
+    return min(
+        RETRY_DELAY_CAP,
+        RETRY_DELAY_BASE * 2**retry_count * (1 + random.random() * 0.5),
+    )
+
+
 def simple_request(func_name, query, variables):
     """
     Returns a request, or raises an Exception if the response does not succeed.
+    Rate limited and 5xx responses are retried first, see retry_delay
     """
-    request = requests.post(
-        "https://api.github.com/graphql",
-        json={"query": query, "variables": variables},
-        headers=HEADERS,
-    )
-    if request.status_code == 200:
-        return request
+    retry_count = 0
+    while True:
+        request = SESSION.post(
+            "https://api.github.com/graphql",
+            json={"query": query, "variables": variables},
+        )
+        if request.status_code == 200:
+            return request
+        delay = retry_delay(request, retry_count)
+        if delay is None:
+            break
+        time.sleep(delay)
+        retry_count += 1
+    if request.status_code == 403:
+        raise Exception(
+            "Too many requests in a short amount of time!\nYou've hit the non-documented anti-abuse limit!"
+        )
     raise Exception(
         func_name, " has failed with a", request.status_code, request.text, QUERY_COUNT
     )
@@ -84,86 +148,27 @@ def graph_commits(start_date, end_date):
     variables = {"start_date": start_date, "end_date": end_date, "login": USER_NAME}
     request = simple_request(graph_commits.__name__, query, variables)
     return int(
-        request.json()["data"]["user"]["contributionsCollection"][
+        response_json(request)["data"]["user"]["contributionsCollection"][
             "contributionCalendar"
         ]["totalContributions"]
     )
 
 
-def graph_repos_stars(count_type, owner_affiliation, cursor=None, add_loc=0, del_loc=0):
-    """
-    Uses GitHub's GraphQL v4 API to return my total repository, star, or lines of code count.
-    """
-    query_count("graph_repos_stars")
-    query = """
-    query ($owner_affiliation: [RepositoryAffiliation], $login: String!, $cursor: String) {
-        user(login: $login) {
-            repositories(first: 100, after: $cursor, ownerAffiliations: $owner_affiliation) {
-                totalCount
-                edges {
-                    node {
-                        ... on Repository {
-                            nameWithOwner
-                            stargazers {
-                                totalCount
-                            }
-                        }
-                    }
-                }
-                pageInfo {
-                    endCursor
-                    hasNextPage
-                }
-            }
-        }
-    }"""
-    variables = {
-        "owner_affiliation": owner_affiliation,
-        "login": USER_NAME,
-        "cursor": cursor,
-    }
-    request = simple_request(graph_repos_stars.__name__, query, variables)
-    if request.status_code == 200:
-        if count_type == "repos":
-            return request.json()["data"]["user"]["repositories"]["totalCount"]
-        elif count_type == "stars":
-            return stars_counter(
-                request.json()["data"]["user"]["repositories"]["edges"]
-            )
-
-
-def recursive_loc(
-    owner,
-    repo_name,
-    data,
-    cache_comment,
-    addition_total=0,
-    deletion_total=0,
-    my_commits=0,
-    cursor=None,
-):
+def recursive_loc(owner, repo_name):
     """
     Uses GitHub's GraphQL v4 API and cursor pagination to fetch 100 commits from a repository at a time
+    (since GraphQL can only search 100 commits at a time), only adds the LOC value of commits authored by me
+    Returns (additions, deletions, my_commits) without touching the cache, so it is safe to run in a thread pool
     """
-    query_count("recursive_loc")
     query = """
-    query ($repo_name: String!, $owner: String!, $cursor: String) {
+    query ($repo_name: String!, $owner: String!, $cursor: String, $owner_id: ID!) {
         repository(name: $repo_name, owner: $owner) {
             defaultBranchRef {
                 target {
                     ... on Commit {
-                        history(first: 100, after: $cursor) {
-                            totalCount
+                        history(first: 100, after: $cursor, author: {id: $owner_id}) {
                             edges {
                                 node {
-                                    ... on Commit {
-                                        committedDate
-                                    }
-                                    author {
-                                        user {
-                                            id
-                                        }
-                                    }
                                     deletions
                                     additions
                                 }
@@ -178,90 +183,39 @@ def recursive_loc(
             }
         }
     }"""
-    variables = {"repo_name": repo_name, "owner": owner, "cursor": cursor}
-    request = requests.post(
-        "https://api.github.com/graphql",
-        json={"query": query, "variables": variables},
-        headers=HEADERS,
-    )  # I cannot use simple_request(), because I want to save the file before raising Exception
-    if request.status_code == 200:
-        if (
-            request.json()["data"]["repository"]["defaultBranchRef"] != None
-        ):  # Only count commits if repo isn't empty
-            return loc_counter_one_repo(
-                owner,
-                repo_name,
-                data,
-                cache_comment,
-                request.json()["data"]["repository"]["defaultBranchRef"]["target"][
-                    "history"
-                ],
-                addition_total,
-                deletion_total,
-                my_commits,
-            )
-        else:
+    addition_total, deletion_total, my_commits = 0, 0, 0
+    cursor = None
+    while True:
+        query_count("recursive_loc")
+        variables = {
+            "repo_name": repo_name,
+            "owner": owner,
+            "cursor": cursor,
+            "owner_id": OWNER_ID_STR,  # GitHub only returns the commits authored by me
+        }
+        # loc_pool saves the partial cache if this raises
+        request = simple_request(recursive_loc.__name__, query, variables)
+        branch = response_json(request)["data"]["repository"]["defaultBranchRef"]
+        if branch is None:  # Only count commits if repo isn't empty
             return 0
-    force_close_file(
-        data, cache_comment
-    )  # saves what is currently in the file before this program crashes
-    if request.status_code == 403:
-        raise Exception(
-            "Too many requests in a short amount of time!\nYou've hit the non-documented anti-abuse limit!"
-        )
-    raise Exception(
-        "recursive_loc() has failed with a",
-        request.status_code,
-        request.text,
-        QUERY_COUNT,
-    )
-
-
-def loc_counter_one_repo(
-    owner,
-    repo_name,
-    data,
-    cache_comment,
-    history,
-    addition_total,
-    deletion_total,
-    my_commits,
-):
-    """
-    Recursively call recursive_loc (since GraphQL can only search 100 commits at a time)
-    only adds the LOC value of commits authored by me
-    """
-    for node in history["edges"]:
-        if node["node"]["author"]["user"] == OWNER_ID:
-            my_commits += 1
+        history = branch["target"]["history"]
+        history_edges = history["edges"]
+        my_commits += len(history_edges)
+        for node in history_edges:
             addition_total += node["node"]["additions"]
             deletion_total += node["node"]["deletions"]
-
-    if history["edges"] == [] or not history["pageInfo"]["hasNextPage"]:
-        return addition_total, deletion_total, my_commits
-    else:
-        return recursive_loc(
-            owner,
-            repo_name,
-            data,
-            cache_comment,
-            addition_total,
-            deletion_total,
-            my_commits,
-            history["pageInfo"]["endCursor"],
-        )
+        if history_edges == [] or not history["pageInfo"]["hasNextPage"]:
+            return addition_total, deletion_total, my_commits
+        cursor = history["pageInfo"]["endCursor"]
 
 
-def loc_query(
-    owner_affiliation, comment_size=0, force_cache=False, cursor=None, edges=[]
-):
+def loc_query(owner_affiliation, force_cache=False):
     """
     Uses GitHub's GraphQL v4 API to query all the repositories I have access to (with respect to owner_affiliation)
     Queries 60 repos at a time, because larger queries give a 502 timeout error and smaller queries send too many
     requests and also give a 502 error.
     Returns the total number of lines of code in all repositories
     """
-    query_count("loc_query")
     query = """
     query ($owner_affiliation: [RepositoryAffiliation], $login: String!, $cursor: String) {
         user(login: $login) {
@@ -289,129 +243,134 @@ def loc_query(
             }
         }
     }"""
-    variables = {
-        "owner_affiliation": owner_affiliation,
-        "login": USER_NAME,
-        "cursor": cursor,
-    }
-    request = simple_request(loc_query.__name__, query, variables)
-    if request.json()["data"]["user"]["repositories"]["pageInfo"][
-        "hasNextPage"
-    ]:  # If repository data has another page
-        edges += request.json()["data"]["user"]["repositories"][
-            "edges"
-        ]  # Add on to the LoC count
-        return loc_query(
-            owner_affiliation,
-            comment_size,
-            force_cache,
-            request.json()["data"]["user"]["repositories"]["pageInfo"]["endCursor"],
-            edges,
-        )
-    else:
-        return cache_builder(
-            edges + request.json()["data"]["user"]["repositories"]["edges"],
-            comment_size,
-            force_cache,
-        )
+    edges = []
+    cursor = None
+    while True:  # If repository data has another page, keep fetching
+        query_count("loc_query")
+        variables = {
+            "owner_affiliation": owner_affiliation,
+            "login": USER_NAME,
+            "cursor": cursor,
+        }
+        request = simple_request(loc_query.__name__, query, variables)
+        page = response_json(request)["data"]["user"]["repositories"]
+        edges.extend(page["edges"])  # Add on to the LoC count
+        if not page["pageInfo"]["hasNextPage"]:
+            break
+        cursor = page["pageInfo"]["endCursor"]
+    return cache_builder(edges, force_cache)
 
 
-def cache_builder(edges, comment_size, force_cache, loc_add=0, loc_del=0):
+def read_cache():
     """
-    Checks each repository in edges to see if it has been updated since the last time it was cached
-    If it has, run recursive_loc on that repository to update the LOC count
+    Returns the comment block (including CACHE_COMMENT_END) and the repository rows of the cache file
     """
-    cached = True  # Assume all repositories are cached
-    filename = (
-        "cache/" + hashlib.sha256(USER_NAME.encode("utf-8")).hexdigest() + ".txt"
-    )  # Create a unique filename for each user
     try:
-        with open(filename, "r") as f:
+        with open(CACHE_FILENAME, "r") as f:
             data = f.readlines()
-    except FileNotFoundError:  # If the cache file doesn't exist, create it
-        data = []
-        if comment_size > 0:
-            for _ in range(comment_size):
-                data.append(
-                    "This line is a comment block. Write whatever you want here.\n"
-                )
-        with open(filename, "w") as f:
-            f.writelines(data)
+    except FileNotFoundError:  # If the cache file doesn't exist, it is created by cache_builder
+        data = [
+            "This line is a comment block. Write whatever you want here.\n"
+        ] * CACHE_COMMENT_LINES + [CACHE_COMMENT_END]
+    if CACHE_COMMENT_END not in data:
+        data.insert(CACHE_COMMENT_LINES, CACHE_COMMENT_END)  # Migrate an older cache file
+    comment_end = data.index(CACHE_COMMENT_END) + 1
+    return data[:comment_end], data[comment_end:]
 
-    if (
-        len(data) - comment_size != len(edges) or force_cache
-    ):  # If the number of repos has changed, or force_cache is True
-        cached = False
-        flush_cache(edges, filename, comment_size)
-        with open(filename, "r") as f:
-            data = f.readlines()
 
-    cache_comment = data[:comment_size]  # save the comment block
-    data = data[comment_size:]  # remove those lines
+def cache_builder(edges, force_cache):
+    """
+    Checks each repository in edges to see if it has been updated since the last time it was cached
+    If it has, run recursive_loc on that repository to update the LOC count
+    """
+    cache_comment, rows = read_cache()  # save the comment block
+    cached = not force_cache  # Assume all repositories are cached
+    cache = {}  # repo hash -> [commit_count, my_commits, additions, deletions]
+    if not force_cache:
+        for line in rows:
+            repo_hash, *row = line.split()
+            cache[repo_hash] = row
+    data = []  # rebuilt in the order of edges, so removed repos are dropped and new repos are added
+    outdated = []  # every repo whose LOC needs to be recounted, as (index, repo_hash, owner, repo_name, commit_count)
     for index in range(len(edges)):
-        repo_hash, commit_count, *__ = data[index].split()
-        if (
-            repo_hash
-            == hashlib.sha256(
-                edges[index]["node"]["nameWithOwner"].encode("utf-8")
-            ).hexdigest()
-        ):
-            try:
-                if (
-                    int(commit_count)
-                    != edges[index]["node"]["defaultBranchRef"]["target"]["history"][
-                        "totalCount"
-                    ]
-                ):
-                    # if commit count has changed, update loc for that repo
-                    owner, repo_name = edges[index]["node"]["nameWithOwner"].split("/")
-                    loc = recursive_loc(owner, repo_name, data, cache_comment)
-                    data[index] = (
-                        repo_hash
-                        + " "
-                        + str(
-                            edges[index]["node"]["defaultBranchRef"]["target"][
-                                "history"
-                            ]["totalCount"]
-                        )
-                        + " "
-                        + str(loc[2])
-                        + " "
-                        + str(loc[0])
-                        + " "
-                        + str(loc[1])
-                        + "\n"
-                    )
-            except TypeError:  # If the repo is empty
-                data[index] = repo_hash + " 0 0 0 0\n"
-    with open(filename, "w") as f:
-        f.writelines(cache_comment)
-        f.writelines(data)
-    for line in data:
-        loc = line.split()
-        loc_add += int(loc[3])
-        loc_del += int(loc[4])
-    return [loc_add, loc_del, loc_add - loc_del, cached]
+        node = edges[index]["node"]
+        name = node["nameWithOwner"]
+        branch = node["defaultBranchRef"]
+        repo_hash = hashlib.sha256(name.encode("utf-8")).hexdigest()
+        row = cache.pop(repo_hash, None)
+        if row is None:  # If the repo is new
+            cached = False
+        if branch is None:  # If the repo is empty
+            data.append(repo_hash + " 0 0 0 0\n")
+            continue
+        commit_count = branch["target"]["history"]["totalCount"]
+        if row is not None and int(row[0]) == commit_count:
+            data.append(repo_hash + " " + " ".join(row) + "\n")
+        else:
+            # if the repo is new or its commit count has changed, update loc for that repo
+            owner, repo_name = name.split("/", 1)
+            outdated.append((index, repo_hash, owner, repo_name, commit_count))
+            data.append(repo_hash + " 0 0 0 0\n")  # filled in by loc_pool
+    if cache:  # Any rows left over belong to repositories that no longer exist
+        cached = False
+    if outdated:
+        loc_pool(data, cache_comment, outdated)
+    write_cache(cache_comment, data)
+    my_commits, loc_add, loc_del = cache_totals(data)
+    return [loc_add, loc_del, loc_add - loc_del, my_commits, cached]
 
 
-def flush_cache(edges, filename, comment_size):
+def cache_totals(data):
     """
-    Wipes the cache file
-    This is called when the number of repositories changes or when the file is first created
+    Sums up my commits and the added and deleted LOC of every repository row in the cache file
+    Returns (my_commits, loc_add, loc_del)
     """
-    with open(filename, "r") as f:
-        data = []
-        if comment_size > 0:
-            data = f.readlines()[:comment_size]  # only save the comment
-    with open(filename, "w") as f:
-        f.writelines(data)
-        for node in edges:
-            f.write(
-                hashlib.sha256(
-                    node["node"]["nameWithOwner"].encode("utf-8")
-                ).hexdigest()
-                + " 0 0 0 0\n"
+    if not data:
+        return 0, 0, 0
+    rows = np.loadtxt(data, usecols=(2, 3, 4), dtype=np.int64, ndmin=2)
+    my_commits, loc_add, loc_del = (int(total) for total in rows.sum(axis=0))
+    return my_commits, loc_add, loc_del
+
+
+def loc_pool(data, cache_comment, outdated):
+    """
+    Runs recursive_loc on every outdated repository at once, since each call is bound by the round-trip to GitHub
+    Results are collected on this thread as they arrive, so data is never written to concurrently
+    """
+    with ThreadPoolExecutor(max_workers=LOC_WORKERS) as executor:
+        futures = {
+            executor.submit(recursive_loc, owner, repo_name): (
+                index,
+                repo_hash,
+                commit_count,
             )
+            for index, repo_hash, owner, repo_name, commit_count in outdated
+        }
+        for future in as_completed(futures):
+            index, repo_hash, commit_count = futures[future]
+            try:
+                loc = future.result()
+                data[index] = (
+                    repo_hash
+                    + " "
+                    + str(commit_count)
+                    + " "
+                    + str(loc[2])
+                    + " "
+                    + str(loc[0])
+                    + " "
+                    + str(loc[1])
+                    + "\n"
+                )
+            except TypeError:  # If the repo is empty
+                data[index] = repo_hash + " 0 0 0 0\n"
+            except Exception:
+                for pending in futures:
+                    pending.cancel()
+                force_close_file(
+                    data, cache_comment
+                )  # saves what is currently in the file before this program crashes
+                raise
 
 
 def add_archive():
@@ -443,18 +402,25 @@ def add_archive():
         return [0, 0, 0, 0, 0]
 
 
+def write_cache(cache_comment, data):
+    """
+    Writes the cache file in one go through a temporary file, so it is never left half written
+    """
+    with open(CACHE_FILENAME + ".tmp", "w") as f:
+        f.writelines(cache_comment)
+        f.writelines(data)
+    os.replace(CACHE_FILENAME + ".tmp", CACHE_FILENAME)
+
+
 def force_close_file(data, cache_comment):
     """
     Forces the file to close, preserving whatever data was written to it
     This is needed because if this function is called, the program would've crashed before the file is properly saved and closed
     """
-    filename = "cache/" + hashlib.sha256(USER_NAME.encode("utf-8")).hexdigest() + ".txt"
-    with open(filename, "w") as f:
-        f.writelines(cache_comment)
-        f.writelines(data)
+    write_cache(cache_comment, data)
     print(
         "There was an error while writing to the cache file. The file,",
-        filename,
+        CACHE_FILENAME,
         "has had the partial data saved and closed.",
     )
 
@@ -463,14 +429,10 @@ def stars_counter(data):
     """
     Count total stars in repositories owned by me
     """
-    total_stars = 0
-    for node in data:
-        total_stars += node["node"]["stargazers"]["totalCount"]
-    return total_stars
+    return sum(node["node"]["stargazers"]["totalCount"] for node in data)
 
 
-def svg_overwrite(
-    filename,
+def svg_substitutions(
     age_data,
     commit_data,
     star_data,
@@ -480,86 +442,89 @@ def svg_overwrite(
     loc_data,
 ):
     """
-    Parse SVG files and update elements with my age, commits, stars, repositories, and lines written
-    """
-    svg = minidom.parse(filename)
-    f = open(filename, mode="w", encoding="utf-8")
-    tspan = svg.getElementsByTagName("tspan")
-    tspan[34].firstChild.data = age_data
-    tspan[69].firstChild.data = repo_data
-    tspan[71].firstChild.data = contrib_data
-    tspan[73].firstChild.data = commit_data
-    tspan[75].firstChild.data = star_data
-    tspan[77].firstChild.data = follower_data
-    tspan[79].firstChild.data = loc_data[2]
-    tspan[80].firstChild.data = loc_data[0] + "++"
-    tspan[81].firstChild.data = loc_data[1] + "--"
-    f.write(svg.toxml("utf-8").decode("utf-8"))
-    f.close()
-
-
-def commit_counter(comment_size):
-    """
-    Counts up my total commits, using the cache file created by cache_builder.
-    """
-    total_commits = 0
-    filename = (
-        "cache/" + hashlib.sha256(USER_NAME.encode("utf-8")).hexdigest() + ".txt"
-    )  # Use the same filename as cache_builder
-    with open(filename, "r") as f:
-        data = f.readlines()
-    cache_comment = data[:comment_size]  # save the comment block
-    data = data[comment_size:]  # remove those lines
-    for line in data:
-        total_commits += int(line.split()[2])
-    return total_commits
+    Returns the (tspan index, text) pairs that update the SVG files with my age, commits, stars, repositories, and lines written
+    Both SVG files share the same layout, so this only needs to be built once
+    Every text is a str, since lxml rejects ints (e.g. the unpadded star count)
+    """
+    return [
+        (34, str(age_data)),
+        (69, str(repo_data)),
+        (71, str(contrib_data)),
+        (73, str(commit_data)),
+        (75, str(star_data)),
+        (77, str(follower_data)),
+        (79, str(loc_data[2])),
+        (80, str(loc_data[0]) + "++"),
+        (81, str(loc_data[1]) + "--"),
+    ]
+
+
+def svg_overwrite(filename, substitutions):
+    """
+    Parse an SVG file and update its elements with the substitutions from svg_substitutions
+    """
+    svg = etree.parse(filename)
+    tspan = TSPAN_XPATH(svg)
+    for index, text in substitutions:
+        tspan[index].text = text
+    svg.write(filename, encoding="utf-8", xml_declaration=True)
 
 
 def svg_element_getter(filename):
     """
     Prints the element index of every element in the SVG file
     """
-    svg = minidom.parse(filename)
-    open(filename, mode="r", encoding="utf-8")
-    tspan = svg.getElementsByTagName("tspan")
+    tspan = TSPAN_XPATH(etree.parse(filename))
     for index in range(len(tspan)):
-        print(index, tspan[index].firstChild.data)
+        print(index, tspan[index].text)
 
 
-def user_getter(username):
+def batched_bootstrap(username):
     """
-    Returns the account ID and creation time of the user
+    Returns the account data, star count, repository count, contributed repository count and follower count
+    of the user, fetched with a single aliased GraphQL query instead of one request each
     """
-    query_count("user_getter")
+    query_count("batched_bootstrap")
     query = """
     query($login: String!){
-        user(login: $login) {
+        acct: user(login: $login) {
             id
             createdAt
         }
-    }"""
-    variables = {"login": username}
-    request = simple_request(user_getter.__name__, query, variables)
-    return {"id": request.json()["data"]["user"]["id"]}, request.json()["data"]["user"][
-        "createdAt"
-    ]
-
-
-def follower_getter(username):
-    """
-    Returns the number of followers of the user
-    """
-    query_count("follower_getter")
-    query = """
-    query($login: String!){
-        user(login: $login) {
+        followers: user(login: $login) {
             followers {
                 totalCount
             }
         }
+        ownerRepos: user(login: $login) {
+            repositories(first: 100, ownerAffiliations: [OWNER]) {
+                totalCount
+                edges {
+                    node {
+                        ... on Repository {
+                            stargazers {
+                                totalCount
+                            }
+                        }
+                    }
+                }
+            }
+        }
+        allRepos: user(login: $login) {
+            repositories(first: 100, ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]) {
+                totalCount
+            }
+        }
     }"""
-    request = simple_request(follower_getter.__name__, query, {"login": username})
-    return int(request.json()["data"]["user"]["followers"]["totalCount"])
+    request = simple_request(batched_bootstrap.__name__, query, {"login": username})
+    data = response_json(request)["data"]
+    return (
+        ({"id": data["acct"]["id"]}, data["acct"]["createdAt"]),
+        stars_counter(data["ownerRepos"]["repositories"]["edges"]),
+        data["ownerRepos"]["repositories"]["totalCount"],
+        data["allRepos"]["repositories"]["totalCount"],
+        int(data["followers"]["followers"]["totalCount"]),
+    )
 
 
 def query_count(funct_id):
@@ -567,7 +532,8 @@ def query_count(funct_id):
     Counts how many times the GitHub GraphQL API is called
     """
     global QUERY_COUNT
-    QUERY_COUNT[funct_id] += 1
+    with QUERY_COUNT_LOCK:  # recursive_loc is called from several threads
+        QUERY_COUNT[funct_id] += 1
 
 
 def perf_counter(funct, *args):
@@ -589,9 +555,17 @@ def formatter(query_type, difference, funct_return=False, whitespace=0):
     print("{:>12}".format("%.4f" % difference + " s ")) if difference > 1 else print(
         "{:>12}".format("%.4f" % (difference * 1000) + " ms")
     )
+    return format_value(funct_return, whitespace)
+
+
+def format_value(value, whitespace=0):
+    """
+    Returns the value with thousands separators, padded to whitespace characters
+    Returns the raw value if whitespace isn't specified
+    """
     if whitespace:
-        return f"{'{:,}'.format(funct_return): <{whitespace}}"
-    return funct_return
+        return f"{'{:,}'.format(value): <{whitespace}}"
+    return value
 
 
 if __name__ == "__main__":
@@ -601,84 +575,67 @@ if __name__ == "__main__":
     print("Calculation times:")
     # define global variable for owner ID and calculate user's creation date
     # e.g {'id': 'MDQ6VXNlcjU3MzMxMTM0'} and 2019-11-03T21:15:07Z for username 'Andrew6rant'
-    user_data, user_time = perf_counter(user_getter, USER_NAME)
+    # account data, stars, repositories, contributed repositories and followers all come from one request
+    bootstrap_data, user_time = perf_counter(batched_bootstrap, USER_NAME)
+    user_data, star_data, repo_data, contrib_data, follower_data = bootstrap_data
     OWNER_ID, acc_date = user_data
+    OWNER_ID_STR = OWNER_ID["id"]  # used by recursive_loc to filter commit history by author
     formatter("account data", user_time)
     age_data, age_time = perf_counter(daily_readme, datetime.datetime(2006, 1, 18))
     formatter("age calculation", age_time)
-    total_loc, loc_time = perf_counter(
-        loc_query, ["OWNER", "COLLABORATOR", "ORGANIZATION_MEMBER"], 7
+    loc_data, loc_time = perf_counter(
+        loc_query, ["OWNER", "COLLABORATOR", "ORGANIZATION_MEMBER"]
     )
-    formatter("LOC (cached)", loc_time) if total_loc[-1] else formatter(
+    # my commits are summed from the same cache rows as the added, deleted, and total LOC
+    *total_loc, commit_data, cached = loc_data
+    formatter("LOC (cached)", loc_time) if cached else formatter(
         "LOC (no cache)", loc_time
     )
-    commit_data, commit_time = perf_counter(commit_counter, 7)
-    star_data, star_time = perf_counter(graph_repos_stars, "stars", ["OWNER"])
-    repo_data, repo_time = perf_counter(graph_repos_stars, "repos", ["OWNER"])
-    contrib_data, contrib_time = perf_counter(
-        graph_repos_stars, "repos", ["OWNER", "COLLABORATOR", "ORGANIZATION_MEMBER"]
-    )
-    follower_data, follower_time = perf_counter(follower_getter, USER_NAME)
 
     # several repositories that I've contributed to have since been deleted.
     if OWNER_ID == {
         "id": "MDQ6VXNlcjY5NDY5Nzkw"
     }:  # only calculate for user Andrew6rant
         archived_data = add_archive()
-        for index in range(len(total_loc) - 1):
+        for index in range(len(total_loc)):
             total_loc[index] += archived_data[index]
         contrib_data += archived_data[-1]
         commit_data += int(archived_data[-2])
 
-    commit_data = formatter("commit counter", commit_time, commit_data, 7)
-    star_data = formatter("star counter", star_time, star_data)
-    repo_data = formatter("my repositories", repo_time, repo_data, 2)
-    contrib_data = formatter("contributed repos", contrib_time, contrib_data, 2)
-    follower_data = formatter("follower counter", follower_time, follower_data, 4)
+    # commits were timed as part of LOC, and stars, repositories, contributed repositories and followers
+    # were timed as part of account data
+    commit_data = format_value(commit_data, 7)
+    star_data = format_value(star_data)
+    repo_data = format_value(repo_data, 2)
+    contrib_data = format_value(contrib_data, 2)
+    follower_data = format_value(follower_data, 4)
 
-    for index in range(len(total_loc) - 1):
+    for index in range(len(total_loc)):
         total_loc[index] = "{:,}".format(
             total_loc[index]
         )  # format added, deleted, and total LOC
 
-    svg_overwrite(
-        "dark_mode.svg",
+    substitutions = svg_substitutions(
         age_data,
         commit_data,
         star_data,
         repo_data,
         contrib_data,
         follower_data,
-        total_loc[:-1],
-    )
-    svg_overwrite(
-        "light_mode.svg",
-        age_data,
-        commit_data,
-        star_data,
-        repo_data,
-        contrib_data,
-        follower_data,
-        total_loc[:-1],
+        total_loc,
     )
+    svg_overwrite("dark_mode.svg", substitutions)
+    svg_overwrite("light_mode.svg", substitutions)
 
     # move cursor to override 'Calculation times:' with 'Total function time:' and the total function time, then move cursor back
     print(
-        "\033[F\033[F\033[F\033[F\033[F\033[F\033[F\033[F",
+        "\033[F\033[F\033[F\033[F",
         "{:<21}".format("Total function time:"),
         "{:>11}".format(
             "%.4f"
-            % (
-                user_time
-                + age_time
-                + loc_time
-                + commit_time
-                + star_time
-                + repo_time
-                + contrib_time
-            )
+            % (user_time + age_time + loc_time)
         ),
-        " s \033[E\033[E\033[E\033[E\033[E\033[E\033[E\033[E",
+        " s \033[E\033[E\033[E\033[E",
         sep="",
     )
 